@@ -1,14 +1,35 @@
+import io
 import os
+import re
 import ssl
+import sys
+import csv
+import json
+import html
+import hmac
+import time
+import codecs
+import bisect
+import random
+import select
+import socket
+import pstats
+import cProfile
 import argparse
+import functools
+import ipaddress
+import threading
 import socketserver
 import subprocess
 import tempfile
 from http.server import SimpleHTTPRequestHandler
-from urllib.parse import unquote, quote
+from urllib.parse import unquote, quote, urlsplit, parse_qs
 from datetime import datetime
 import mimetypes
 
+mimetypes.add_type('application/x-ndjson', '.ndjson')
+mimetypes.add_type('application/x-ndjson', '.jsonl')
+
 # -------------------------------
 # Argument Parser
 # -------------------------------
@@ -21,6 +42,18 @@ def parse_args():
     parser.add_argument('--cert', help='Path to SSL certificate')
     parser.add_argument('--key', help='Path to SSL private key')
     parser.add_argument('--upload-password', help='Password required to upload files')
+    parser.add_argument('--header-timeout', type=float, default=10, help='Seconds allowed to receive request headers (default: 10, 0 disables)')
+    parser.add_argument('--body-timeout', type=float, default=30, help='Idle seconds allowed while reading a body or writing a response (default: 30, 0 disables)')
+    parser.add_argument('--min-upload-rate', type=int, default=1024, help='Minimum upload rate in bytes/s after the first 5 seconds (default: 1024, 0 disables)')
+    parser.add_argument('--max-connections', type=int, default=200, help='Maximum concurrent connections (default: 200, 0 disables)')
+    parser.add_argument('--max-connections-per-ip', type=int, default=32, help='Maximum concurrent connections per client IP (default: 32, 0 disables)')
+    parser.add_argument('--max-uploads', type=int, default=4, help='Maximum concurrent uploads (default: 4, 0 disables)')
+    parser.add_argument('--retry-after', type=int, default=5, help='Retry-After seconds sent with 503 responses (default: 5)')
+    parser.add_argument('--profile', action='store_true', help='Enable request profiling and the /debug/profile endpoint')
+    parser.add_argument('--profile-sample', type=float, default=0.05, help='Fraction of requests to run under cProfile (default: 0.05)')
+    parser.add_argument('--profile-slow-ms', type=float, default=500, help='Keep stack samples of requests slower than this (default: 500)')
+    parser.add_argument('--profile-dir', default=os.path.join(tempfile.gettempdir(), 'upserver_profiles'), help='Directory for profile reports')
+    parser.add_argument('--profile-token', help='Token allowing non-local clients to use /debug/profile (?token=...)')
     return parser.parse_args()
 
 # -------------------------------
@@ -45,6 +78,525 @@ def generate_self_signed_cert():
 
     return cert_path, key_path
 
+# -------------------------------
+# Line Index (CSV / NDJSON preview)
+# -------------------------------
+INDEX_BLOCK_SIZE = 64 * 1024
+INDEX_CACHE_SIZE = 32
+INDEX_WAIT = 0.25
+INDEX_FINGERPRINT_SIZE = 64
+
+QUOTED_SPAN = re.compile(rb'"[^"]*"')
+
+def count_records(chunk, in_quote):
+    # Count newlines outside CSV quoted fields. Returns the count, the index
+    # of the last such newline (-1 if none) and whether the chunk ends inside
+    # a quoted field. Doubled quotes keep the parity, so they need no handling.
+    start = 0
+    if in_quote:
+        start = chunk.find(b'"') + 1
+        if not start:
+            return 0, -1, True
+    outside = QUOTED_SPAN.sub(b'', chunk[start:])
+    open_quote = outside.find(b'"')
+    if open_quote >= 0:
+        outside = outside[:open_quote]
+    records = outside.count(b'\n')
+
+    boundary = -1
+    if records:
+        boundary = chunk.rfind(b'\n')
+        while chunk.count(b'"', start, boundary) % 2:
+            boundary = chunk.rfind(b'\n', start, chunk.rfind(b'"', start, boundary))
+    return records, boundary, open_quote >= 0
+
+class LineIndex:
+    # Sparse index of line start offsets: one checkpoint at the last line
+    # boundary of every INDEX_BLOCK_SIZE block, so any line is at most one
+    # block of reads away from a seek target. With `quoted` set, newlines
+    # inside CSV quoted fields are not line boundaries, so lines are records.
+    # Scan state is kept so a file that only grew is indexed from where the
+    # last scan stopped instead of from byte 0.
+    def __init__(self, path, stat, quoted=False):
+        self.path = path
+        self.quoted = quoted
+        self.identity = (stat.st_dev, stat.st_ino)
+        self.mtime = stat.st_mtime
+        self.size = stat.st_size
+        self.line_numbers = [0]
+        self.offsets = [0]
+        self.total_lines = None
+        self.lines = 0
+        self.scanned = 0
+        self.in_quote = False
+        self.last_bytes = b''
+        self.building = True
+        self.pending = False
+        self.cancelled = False
+        self.complete = threading.Event()
+        self.lock = threading.Lock()
+
+    def is_stale(self, stat):
+        return stat.st_mtime != self.mtime or stat.st_size != self.size
+
+    def can_extend(self, stat):
+        if (stat.st_dev, stat.st_ino) != self.identity or stat.st_size <= self.size:
+            return False
+        with self.lock:
+            if self.building:
+                return True
+            scanned, last_bytes = self.scanned, self.last_bytes
+        # Bytes just before the scan position must be unchanged, otherwise the
+        # file was rewritten rather than appended to
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(scanned - len(last_bytes))
+                return f.read(len(last_bytes)) == last_bytes
+        except OSError:
+            return False
+
+    def extend(self, stat):
+        with self.lock:
+            self.mtime = stat.st_mtime
+            self.size = stat.st_size
+            if self.building:
+                self.pending = True
+                return
+            self.building = True
+            self.total_lines = None
+            self.complete.clear()
+        threading.Thread(target=self.build, daemon=True).start()
+
+    def build(self):
+        try:
+            with open(self.path, 'rb') as f:
+                while True:
+                    f.seek(self.scanned)
+                    self.scan(f)
+                    # Finish in the same critical section as the pending check,
+                    # so a concurrent extend() either sets pending first or
+                    # sees building=False and starts a new scan
+                    with self.lock:
+                        if self.cancelled or not self.pending:
+                            if not self.cancelled:
+                                partial = self.last_bytes and (self.in_quote or not self.last_bytes.endswith(b'\n'))
+                                self.total_lines = self.lines + (1 if partial else 0)
+                            self.building = False
+                            break
+                        self.pending = False
+        except OSError:
+            with self.lock:
+                self.building = False
+        finally:
+            self.complete.set()
+
+    def scan(self, f):
+        while not self.cancelled:
+            chunk = f.read(INDEX_BLOCK_SIZE)
+            if not chunk:
+                return
+            if self.quoted:
+                newlines, boundary, self.in_quote = count_records(chunk, self.in_quote)
+            else:
+                newlines, boundary = chunk.count(b'\n'), chunk.rfind(b'\n')
+            with self.lock:
+                if newlines:
+                    self.lines += newlines
+                    self.line_numbers.append(self.lines)
+                    self.offsets.append(self.scanned + boundary + 1)
+                self.scanned += len(chunk)
+                self.last_bytes = (self.last_bytes + chunk[-INDEX_FINGERPRINT_SIZE:])[-INDEX_FINGERPRINT_SIZE:]
+
+    def indexed_lines(self):
+        if self.total_lines is not None:
+            return self.total_lines
+        with self.lock:
+            return self.line_numbers[-1]
+
+    def progress(self):
+        if not self.size:
+            return 100
+        return min(100, int(self.scanned * 100 / self.size))
+
+    def locate(self, start):
+        with self.lock:
+            i = bisect.bisect_right(self.line_numbers, start) - 1
+            return self.line_numbers[i], self.offsets[i]
+
+    def read_lines(self, start, count):
+        line_no, offset = self.locate(start)
+        lines = []
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for _ in range(start - line_no):
+                if not f.readline():
+                    return lines
+            for _ in range(count):
+                line = f.readline()
+                if not line:
+                    break
+                lines.append(line.rstrip(b'\r\n'))
+        return lines
+
+    def read_records(self, start, count):
+        line_no, offset = self.locate(start)
+        records = []
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            reader = csv.reader(io.TextIOWrapper(f, encoding='utf-8', errors='replace', newline=''))
+            try:
+                for _ in range(start - line_no):
+                    next(reader)
+                for _ in range(count):
+                    records.append(next(reader))
+            except StopIteration:
+                pass
+        return records
+
+_line_indexes = {}
+_line_indexes_lock = threading.Lock()
+
+def get_line_index(path, quoted=False):
+    stat = os.stat(path)
+    with _line_indexes_lock:
+        index = _line_indexes.pop(path, None)
+        if index is not None and index.is_stale(stat) and index.can_extend(stat):
+            index.extend(stat)
+        elif index is None or index.is_stale(stat):
+            if index is not None:
+                index.cancelled = True
+            index = LineIndex(path, stat, quoted)
+            threading.Thread(target=index.build, daemon=True).start()
+        _line_indexes[path] = index
+        while len(_line_indexes) > INDEX_CACHE_SIZE:
+            oldest = _line_indexes.pop(next(iter(_line_indexes)))
+            oldest.cancelled = True
+    return index
+
+# -------------------------------
+# File Follower (tail mode)
+# -------------------------------
+TAIL_DEFAULT_LINES = 100
+TAIL_MAX_LINES = 10000
+TAIL_BLOCK_SIZE = 8192
+TAIL_MAX_BYTES = 1024 * 1024
+TAIL_CHUNK_SIZE = 64 * 1024
+TAIL_POLL_INTERVAL = 1.0
+TAIL_HEARTBEAT = 15.0
+
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+def load_inotify():
+    # inotify is Linux-only; everywhere else followers fall back to polling
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        return libc
+    except (ImportError, OSError, AttributeError, TypeError):
+        return None
+
+_inotify = load_inotify()
+
+def read_last_lines(f, count):
+    end = f.seek(0, os.SEEK_END)
+    position = end
+    blocks = []
+    newlines = 0
+    while position > 0 and newlines <= count and end - position < TAIL_MAX_BYTES:
+        size = min(TAIL_BLOCK_SIZE, position, TAIL_MAX_BYTES - (end - position))
+        position -= size
+        f.seek(position)
+        block = f.read(size)
+        blocks.append(block)
+        newlines += block.count(b'\n')
+    f.seek(end)
+
+    data = b''.join(reversed(blocks))
+    if position > 0 and newlines <= count:
+        # Byte budget hit before enough lines: start at the first whole line
+        data = data[data.find(b'\n') + 1:] if newlines else b''
+    trailing = data.endswith(b'\n')
+    lines = data.split(b'\n')
+    if trailing:
+        lines.pop()
+    data = b'\n'.join(lines[-count:]) if count else b''
+    return data + b'\n' if trailing and data else data
+
+class FileWatcher:
+    # One watcher thread per followed path, shared by all of its followers.
+    # Wakes on inotify events for the containing directory when available,
+    # otherwise polls, and bumps `version` whenever the file's stat changes.
+    def __init__(self, path):
+        self.path = path
+        self.followers = 0
+        self.version = 0
+        self.changed = threading.Condition()
+        self.signature = self.stat_signature()
+
+    def stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def open_inotify(self):
+        if _inotify is None:
+            return None
+        fd = _inotify.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        directory = os.path.dirname(self.path) or '.'
+        if _inotify.inotify_add_watch(fd, os.fsencode(directory), IN_WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    def run(self):
+        fd = self.open_inotify()
+        try:
+            while True:
+                with _file_watchers_lock:
+                    if self.followers == 0:
+                        del _file_watchers[self.path]
+                        return
+                if fd is not None:
+                    ready, _, _ = select.select([fd], [], [], TAIL_POLL_INTERVAL)
+                    if ready:
+                        try:
+                            while os.read(fd, 4096):
+                                pass
+                        except BlockingIOError:
+                            pass
+                else:
+                    time.sleep(TAIL_POLL_INTERVAL)
+
+                signature = self.stat_signature()
+                if signature != self.signature:
+                    self.signature = signature
+                    with self.changed:
+                        self.version += 1
+                        self.changed.notify_all()
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def wait(self, version, timeout):
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+_file_watchers = {}
+_file_watchers_lock = threading.Lock()
+
+def acquire_file_watcher(path):
+    with _file_watchers_lock:
+        watcher = _file_watchers.get(path)
+        if watcher is None:
+            watcher = FileWatcher(path)
+            _file_watchers[path] = watcher
+            threading.Thread(target=watcher.run, daemon=True).start()
+        watcher.followers += 1
+    return watcher
+
+def release_file_watcher(watcher):
+    with _file_watchers_lock:
+        watcher.followers -= 1
+
+# -------------------------------
+# Request Profiler
+# -------------------------------
+PROFILE_SAMPLE_INTERVAL = 0.005
+PROFILE_SKIP_PREFIXES = ['/tail/', '/debug/']
+PROFILE_ROUTE_PREFIXES = ['/upload', '/preview/']
+
+class RequestProfiler:
+    # While capture is on, a sampler thread records the stack of every
+    # in-flight request. Stacks are kept for requests slower than the
+    # threshold and for the sampled fraction, which also runs under cProfile.
+    # Reports are aggregated per route. While capture is off the only cost
+    # is the `active` check in `profiled`.
+    def __init__(self):
+        self.enabled = False
+        self.token = ""
+        self.active = False
+        self.sample_rate = 0.0
+        self.slow_threshold = None
+        self.output_dir = None
+        self.lock = threading.Lock()
+        self.cprofile_lock = threading.Lock()
+        self.running = {}
+        self.stop_event = None
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+            self.stacks = {}
+            self.summary = {}
+
+    def start(self):
+        with self.lock:
+            if self.active:
+                return
+            self.active = True
+            self.stop_event = threading.Event()
+            threading.Thread(target=self.sample_loop, args=(self.stop_event,), daemon=True).start()
+
+    def stop(self):
+        with self.lock:
+            if not self.active:
+                return
+            self.active = False
+            self.stop_event.set()
+
+    def sample_loop(self, stop_event):
+        while not stop_event.wait(PROFILE_SAMPLE_INTERVAL):
+            if not self.running:
+                continue
+            frames = sys._current_frames()
+            with self.lock:
+                for ident, samples in self.running.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stack = self.collapse(frame)
+                        samples[stack] = samples.get(stack, 0) + 1
+
+    def collapse(self, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def route_name(self, handler):
+        path = urlsplit(handler.path).path
+        for prefix in PROFILE_ROUTE_PREFIXES:
+            if path.startswith(prefix):
+                return f"{handler.command}_{prefix.strip('/')}"
+        if os.path.isdir(handler.translate_path(path)):
+            return f"{handler.command}_listing"
+        return f"{handler.command}_static"
+
+    def run(self, handler, method, *args):
+        if any(handler.path.startswith(prefix) for prefix in PROFILE_SKIP_PREFIXES):
+            return method(handler, *args)
+
+        route = self.route_name(handler)
+        ident = threading.get_ident()
+        samples = {}
+        # cProfile can only run for one request at a time on newer Pythons
+        profile = None
+        if random.random() < self.sample_rate and self.cprofile_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+
+        with self.lock:
+            self.running[ident] = samples
+        start = time.perf_counter()
+        try:
+            if profile is not None:
+                return profile.runcall(method, handler, *args)
+            return method(handler, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile is not None:
+                self.cprofile_lock.release()
+            with self.lock:
+                self.running.pop(ident, None)
+            self.record(route, elapsed, profile, samples)
+
+    def record(self, route, elapsed, profile, samples):
+        slow = self.slow_threshold is not None and elapsed >= self.slow_threshold
+        with self.lock:
+            summary = self.summary.setdefault(route, {'requests': 0, 'profiled': 0, 'slow': 0, 'total': 0.0, 'max': 0.0})
+            summary['requests'] += 1
+            summary['total'] += elapsed
+            summary['max'] = max(summary['max'], elapsed)
+            if slow:
+                summary['slow'] += 1
+            if profile is not None:
+                summary['profiled'] += 1
+                if route in self.stats:
+                    self.stats[route].add(profile)
+                else:
+                    self.stats[route] = pstats.Stats(profile)
+            if samples and (slow or profile is not None):
+                stacks = self.stacks.setdefault(route, {})
+                for stack, count in samples.items():
+                    stacks[stack] = stacks.get(stack, 0) + count
+
+    def write_reports(self):
+        # Snapshot under the lock; requests and the sampler take it too, so
+        # all disk I/O happens after it is released
+        with self.lock:
+            all_stats = {}
+            for route, stats in self.stats.items():
+                all_stats[route] = pstats.Stats()
+                all_stats[route].add(stats)
+            all_stacks = {route: dict(stacks) for route, stacks in self.stacks.items()}
+            status = self.format_status(self.summary)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        written = []
+        for route, stats in all_stats.items():
+            path = os.path.join(self.output_dir, f"{route}.pstats")
+            stats.dump_stats(path)
+            written.append(path)
+        for route, stacks in all_stacks.items():
+            path = os.path.join(self.output_dir, f"{route}.collapsed")
+            with open(path, 'w') as f:
+                for stack, count in sorted(stacks.items()):
+                    f.write(f"{stack} {count}\n")
+            written.append(path)
+
+        path = os.path.join(self.output_dir, "summary.txt")
+        with open(path, 'w') as f:
+            f.write(status)
+            for route, stats in sorted(all_stats.items()):
+                stream = io.StringIO()
+                stats.stream = stream
+                stats.sort_stats('cumulative').print_stats(20)
+                f.write(f"\n===== {route} =====\n{stream.getvalue()}")
+        written.append(path)
+        return written
+
+    def status_text(self):
+        with self.lock:
+            return self.format_status(self.summary)
+
+    def format_status(self, route_summaries):
+        threshold = f"{self.slow_threshold * 1000:.0f} ms" if self.slow_threshold is not None else "off"
+        text = f"PROFILING: {'ON' if self.active else 'OFF'}\n"
+        text += f"Sample rate: {self.sample_rate} | Slow threshold: {threshold} | Reports: {self.output_dir}\n\n"
+        text += f"{'ROUTE':<20}{'REQUESTS':>10}{'PROFILED':>10}{'SLOW':>8}{'AVG MS':>10}{'MAX MS':>10}\n"
+        for route, summary in sorted(route_summaries.items()):
+            average = summary['total'] * 1000 / summary['requests']
+            text += f"{route:<20}{summary['requests']:>10}{summary['profiled']:>10}{summary['slow']:>8}{average:>10.1f}{summary['max'] * 1000:>10.1f}\n"
+        return text
+
+profiler = RequestProfiler()
+
+def profiled(method):
+    @functools.wraps(method)
+    def wrapper(handler, *args):
+        if not profiler.active:
+            return method(handler, *args)
+        return profiler.run(handler, method, *args)
+    return wrapper
+
 # -------------------------------
 # Custom Handler
 # -------------------------------
@@ -54,13 +606,83 @@ class UPSERVERHandler(SimpleHTTPRequestHandler):
         'text/', 'image/', 'application/pdf', 'video/', 'audio/',
         'application/json', 'application/xml', 'application/javascript',
         'text/css', 'text/csv', 'application/x-yaml', 'text/markdown',
+        'application/x-ndjson',
     ]
+    tailable_extensions = ['.log']
+    table_preview_types = ['text/csv', 'application/x-ndjson']
+    header_timeout = None
+    body_timeout = None
+    min_upload_rate = 0
+    upload_slots = None
+    table_page_size = 100
+    table_max_page_size = 1000
 
+    def setup(self):
+        self.timeout = self.header_timeout
+        super().setup()
+        # Deadline covers the TLS handshake and the whole request header
+        if self.header_timeout:
+            self.server.set_deadline(self.connection, self.header_timeout)
+        self.handshake_ok = True
+        if isinstance(self.connection, ssl.SSLSocket):
+            try:
+                self.connection.do_handshake()
+            except OSError:
+                self.handshake_ok = False
+
+    def handle(self):
+        if self.handshake_ok:
+            super().handle()
+
+    def parse_request(self):
+        parsed = super().parse_request()
+        self.server.clear_deadline(self.connection)
+        self.connection.settimeout(self.body_timeout)
+        return parsed
+
+    def send_overloaded(self):
+        body = OVERLOADED_MESSAGE.encode("utf-8")
+        self.send_response(503)
+        self.send_header("Retry-After", str(self.server.retry_after))
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+        self.close_connection = True
+
+    def read_body(self, length):
+        chunks = []
+        received = 0
+        start = time.monotonic()
+        while received < length:
+            try:
+                chunk = self.rfile.read1(min(UPLOAD_CHUNK_SIZE, length - received))
+            except socket.timeout:
+                self.send_error(408, "Request body timed out")
+                return None
+            if not chunk:
+                self.close_connection = True
+                return None
+            chunks.append(chunk)
+            received += len(chunk)
+
+            elapsed = time.monotonic() - start
+            if self.min_upload_rate and elapsed > RATE_GRACE_PERIOD and received / elapsed < self.min_upload_rate:
+                self.send_error(408, "Upload too slow")
+                return None
+        return b"".join(chunks)
+
+    @profiled
     def do_GET(self):
-        if self.path.startswith("/upload"):
+        if self.path.startswith("/debug/profile"):
+            self.handle_profile_control()
+        elif self.path.startswith("/upload"):
             self.handle_upload_page()
         elif self.path.startswith("/preview/"):
             self.handle_file_preview()
+        elif self.path.startswith("/tail/"):
+            self.handle_tail()
         else:
             # Check if this is a file request (not directory)
             path = self.translate_path(self.path)
@@ -83,8 +705,10 @@ class UPSERVERHandler(SimpleHTTPRequestHandler):
 
     def handle_file_preview(self):
         try:
-            # Extract the file path from the URL
-            relative_path = unquote(self.path[len('/preview/'):])
+            # Extract the file path and query from the URL
+            url = urlsplit(self.path)
+            relative_path = unquote(url.path[len('/preview/'):])
+            query = parse_qs(url.query)
             full_path = os.path.join(os.getcwd(), relative_path)
             
             if not os.path.isfile(full_path):
@@ -95,10 +719,6 @@ class UPSERVERHandler(SimpleHTTPRequestHandler):
             file_size = os.path.getsize(full_path)
             modified_time = datetime.fromtimestamp(os.path.getmtime(full_path)).strftime('%Y-%m-%d %H:%M:%S')
 
-            # Generate the preview page
-            with open(full_path, 'rb') as f:
-                content = f.read()
-
             # ASCII Art Logo
             logo = r"""
   _    _ _____ _____ _____ _____ _____ _____ _____ 
@@ -113,9 +733,12 @@ class UPSERVERHandler(SimpleHTTPRequestHandler):
             preview_content = ""
             if mime_type.startswith('image/'):
                 preview_content = f'<div class="preview-area"><img src="/{relative_path}" alt="Image preview" style="max-width: 100%; max-height: 70vh;"></div>'
+            elif mime_type in self.table_preview_types:
+                preview_content = self.render_table_preview(full_path, relative_path, mime_type, query)
             elif mime_type.startswith('text/') or mime_type in ['application/json', 'application/xml']:
                 try:
-                    text_content = content.decode('utf-8')
+                    with open(full_path, 'rb') as f:
+                        text_content = f.read().decode('utf-8')
                     preview_content = f'<div class="preview-area"><pre>{text_content}</pre></div>'
                 except UnicodeDecodeError:
                     preview_content = '<div class="preview-area"><p>Binary content cannot be displayed</p></div>'
@@ -239,6 +862,45 @@ class UPSERVERHandler(SimpleHTTPRequestHandler):
             white-space: pre-wrap;
             word-wrap: break-word;
         }}
+        
+        .data-table {{
+            border-collapse: collapse;
+            font-size: 13px;
+        }}
+        
+        .data-table th {{
+            position: sticky;
+            top: 0;
+            background-color: #003300;
+            padding: 6px 10px;
+            text-align: left;
+            border-bottom: 1px solid #00ff00;
+        }}
+        
+        .data-table td {{
+            padding: 4px 10px;
+            border-bottom: 1px solid #003300;
+            white-space: pre;
+        }}
+        
+        .data-table .row-num {{
+            color: #009900;
+            text-align: right;
+        }}
+        
+        .pager {{
+            margin: 10px 0;
+        }}
+        
+        .pager a, .pager input, .pager button {{
+            background-color: #003300;
+            color: #00ff00;
+            border: 1px solid #00ff00;
+            padding: 4px 10px;
+            margin-right: 5px;
+            font-family: inherit;
+            text-decoration: none;
+        }}
     </style>
 </head>
 <body>
@@ -275,6 +937,288 @@ class UPSERVERHandler(SimpleHTTPRequestHandler):
         except Exception as e:
             self.send_error(500, f"Error generating preview: {str(e)}")
 
+    def render_table_preview(self, full_path, relative_path, mime_type, query):
+        is_csv = mime_type == 'text/csv'
+        index = get_line_index(full_path, quoted=is_csv)
+        index.complete.wait(INDEX_WAIT)
+
+        try:
+            start = max(0, int(query.get('start', ['1'])[0]) - 1)
+        except ValueError:
+            start = 0
+        try:
+            page_size = int(query.get('rows', [str(self.table_page_size)])[0])
+        except ValueError:
+            page_size = self.table_page_size
+        page_size = min(max(1, page_size), self.table_max_page_size)
+
+        # CSV files carry a header record; NDJSON rows start at line 0
+        first_line = 1 if is_csv else 0
+        complete = index.total_lines is not None
+        known_rows = max(0, index.indexed_lines() - first_line)
+        if complete:
+            start = min(start, max(0, known_rows - 1))
+
+        base_url = f"/preview/{quote(relative_path)}"
+        if not complete and start >= known_rows:
+            return f'''
+                <div class="preview-area">
+                    <p>Indexing... {index.progress()}% scanned, {known_rows} rows indexed so far.</p>
+                    <script>setTimeout(function() {{ location.reload(); }}, 2000);</script>
+                </div>
+                '''
+
+        if is_csv:
+            header = index.read_records(0, 1)
+            columns = [column.lstrip('\ufeff') for column in header[0]] if header else []
+            rows = index.read_records(start + first_line, page_size)
+            width = max([len(columns)] + [len(row) for row in rows])
+            columns += [''] * (width - len(columns))
+        else:
+            columns = []
+            records = []
+            for line in index.read_lines(start + first_line, page_size):
+                line = line.decode('utf-8', 'replace')
+                try:
+                    record = json.loads(line) if line.strip() else {}
+                except ValueError:
+                    record = {'(invalid JSON)': line}
+                if not isinstance(record, dict):
+                    record = {'(value)': record}
+                for key in record:
+                    if key not in columns:
+                        columns.append(key)
+                records.append(record)
+            rows = [[self.format_cell(record.get(key, '')) for key in columns] for record in records]
+
+        table = '<table class="data-table"><thead><tr><th>#</th>'
+        table += ''.join(f'<th>{html.escape(str(column))}</th>' for column in columns)
+        table += '</tr></thead><tbody>'
+        for number, row in enumerate(rows, start + 1):
+            table += f'<tr><td class="row-num">{number}</td>'
+            table += ''.join(f'<td>{html.escape(cell)}</td>' for cell in row)
+            table += '</tr>'
+        table += '</tbody></table>'
+
+        end = start + len(rows)
+        if complete:
+            total_display = f"of {known_rows}"
+        else:
+            total_display = f"of {known_rows}+ (indexing {index.progress()}%)"
+        links = [f'<a href="{base_url}?start=1&rows={page_size}">FIRST</a>']
+        if start > 0:
+            links.append(f'<a href="{base_url}?start={max(0, start - page_size) + 1}&rows={page_size}">PREV</a>')
+        if not complete or end < known_rows:
+            links.append(f'<a href="{base_url}?start={end + 1}&rows={page_size}">NEXT</a>')
+        if complete:
+            links.append(f'<a href="{base_url}?start={max(0, known_rows - page_size) + 1}&rows={page_size}">LAST</a>')
+
+        return f'''
+                <div class="pager">
+                    Rows {start + 1 if rows else 0}-{end} {total_display}
+                </div>
+                <div class="pager">
+                    {' '.join(links)}
+                    <form method="get" action="{base_url}" style="display: inline;">
+                        <input type="number" name="start" min="1" value="{start + 1}">
+                        <input type="hidden" name="rows" value="{page_size}">
+                        <button type="submit">JUMP</button>
+                    </form>
+                </div>
+                <div class="preview-area">{table}</div>
+                '''
+
+    def format_cell(self, value):
+        if isinstance(value, str):
+            return value
+        return json.dumps(value)
+
+    def is_tailable(self, name, mime_type):
+        return bool(mime_type and mime_type.startswith('text/')) or os.path.splitext(name)[1] in self.tailable_extensions
+
+    def handle_tail(self):
+        url = urlsplit(self.path)
+        full_path = self.translate_path(url.path[len('/tail'):])
+        relative_path = unquote(url.path[len('/tail/'):])
+        if not os.path.isfile(full_path):
+            self.send_error(404, "File not found")
+            return
+
+        query = parse_qs(url.query)
+        try:
+            lines = int(query.get('lines', [str(TAIL_DEFAULT_LINES)])[0])
+        except ValueError:
+            lines = TAIL_DEFAULT_LINES
+        lines = min(max(0, lines), TAIL_MAX_LINES)
+
+        if 'text/event-stream' in self.headers.get('Accept', ''):
+            self.stream_tail(full_path, lines)
+        else:
+            self.handle_tail_page(relative_path, lines)
+
+    def handle_tail_page(self, relative_path, lines):
+        html_page = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>TAIL: {html.escape(relative_path)}</title>
+            <style>
+                body {{ background:black; color:lime; font-family:monospace; padding:2em; }}
+                pre {{ white-space:pre-wrap; word-wrap:break-word; }}
+                #status {{ color:#009900; }}
+            </style>
+        </head>
+        <body>
+            <h2>📜 TAIL: {html.escape(relative_path)}</h2>
+            <div id="status">CONNECTING...</div>
+            <pre id="log"></pre>
+
+            <script>
+            const MAX_CHARS = 1000000;
+            const log = document.getElementById("log");
+            const status = document.getElementById("status");
+
+            function append(text) {{
+                const follow = window.innerHeight + window.scrollY >= document.body.scrollHeight - 20;
+                log.textContent = (log.textContent + text).slice(-MAX_CHARS);
+                if (follow) {{
+                    window.scrollTo(0, document.body.scrollHeight);
+                }}
+            }}
+
+            const source = new EventSource(location.pathname + "?lines={lines}");
+            source.onopen = () => {{
+                log.textContent = "";
+                status.textContent = "FOLLOWING";
+            }};
+            source.onmessage = (event) => append(event.data);
+            source.addEventListener("notice", (event) => append("\\n--- " + event.data + " ---\\n"));
+            source.onerror = () => {{
+                status.textContent = "RECONNECTING...";
+            }};
+            </script>
+        </body>
+        </html>
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        self.wfile.write(html_page.encode("utf-8"))
+
+    def stream_tail(self, full_path, lines):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.close_connection = True
+
+        watcher = acquire_file_watcher(full_path)
+        f = None
+        try:
+            f = open(full_path, 'rb')
+            identity = self.file_identity(os.fstat(f.fileno()))
+            decoder = codecs.getincrementaldecoder('utf-8')('replace')
+            self.send_event(decoder.decode(read_last_lines(f, lines)))
+
+            # Memory per follower stays at one open file and one read chunk
+            while True:
+                version = watcher.version
+                data = f.read(TAIL_CHUNK_SIZE)
+                if data:
+                    self.send_event(decoder.decode(data))
+                    continue
+
+                # At EOF: check for rotation (new inode at the path) or truncation
+                try:
+                    current = os.stat(full_path)
+                except FileNotFoundError:
+                    current = None
+                if current is not None and self.file_identity(current) != identity:
+                    try:
+                        reopened = open(full_path, 'rb')
+                    except OSError:
+                        reopened = None
+                    if reopened is not None:
+                        f.close()
+                        f = reopened
+                        identity = self.file_identity(os.fstat(f.fileno()))
+                        decoder.reset()
+                        self.send_event("file rotated", "notice")
+                        continue
+                if os.fstat(f.fileno()).st_size < f.tell():
+                    f.seek(0)
+                    decoder.reset()
+                    self.send_event("file truncated", "notice")
+                    continue
+
+                if watcher.wait(version, TAIL_HEARTBEAT) == version:
+                    self.wfile.write(b": keepalive\n\n")
+        except OSError:
+            # Client went away or the file became unreadable
+            pass
+        finally:
+            if f is not None:
+                f.close()
+            release_file_watcher(watcher)
+
+    def file_identity(self, stat):
+        return (stat.st_dev, stat.st_ino)
+
+    def send_event(self, text, event=None):
+        if not text:
+            return
+        payload = f"event: {event}\n" if event else ""
+        payload += "".join(f"data: {line}\n" for line in text.replace("\r", "").split("\n"))
+        self.wfile.write((payload + "\n").encode("utf-8"))
+
+    def handle_profile_control(self):
+        if not profiler.enabled:
+            self.send_error(404)
+            return
+
+        query = parse_qs(urlsplit(self.path).query)
+        if not self.is_profile_client_allowed(query):
+            self.send_error(403, "Profiling control is limited to local clients or --profile-token")
+            return
+
+        action = query.get('action', ['status'])[0]
+        try:
+            if 'sample' in query:
+                profiler.sample_rate = min(max(0.0, float(query['sample'][0])), 1.0)
+            if 'slow_ms' in query:
+                profiler.slow_threshold = float(query['slow_ms'][0]) / 1000
+        except ValueError:
+            self.send_error(400, "Invalid profiling parameter")
+            return
+
+        message = ""
+        if action == 'start':
+            profiler.start()
+        elif action == 'stop':
+            profiler.stop()
+            message = "Reports written:\n" + "\n".join(profiler.write_reports()) + "\n\n"
+        elif action == 'dump':
+            message = "Reports written:\n" + "\n".join(profiler.write_reports()) + "\n\n"
+        elif action == 'reset':
+            profiler.reset()
+        elif action != 'status':
+            self.send_error(400, "Unknown action")
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.end_headers()
+        self.wfile.write((message + profiler.status_text()).encode("utf-8"))
+
+    def is_profile_client_allowed(self, query):
+        try:
+            if ipaddress.ip_address(self.client_address[0]).is_loopback:
+                return True
+        except ValueError:
+            pass
+        token = query.get('token', [''])[0]
+        return bool(profiler.token) and hmac.compare_digest(token, profiler.token)
+
     def handle_upload_page(self):
         if not self.upload_password:
             self.send_response(403)
@@ -332,6 +1276,7 @@ class UPSERVERHandler(SimpleHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(html.encode("utf-8"))
 
+    @profiled
     def do_POST(self):
         if self.path != "/upload":
             self.send_error(404)
@@ -346,8 +1291,22 @@ class UPSERVERHandler(SimpleHTTPRequestHandler):
             return
 
         boundary = content_type.split("boundary=")[-1].encode()
-        remain = int(self.headers.get("Content-Length"))
-        data = self.rfile.read(remain)
+        try:
+            remain = int(self.headers.get("Content-Length"))
+        except (TypeError, ValueError):
+            self.send_error(411, "Content-Length required")
+            return
+
+        if self.upload_slots is not None and not self.upload_slots.acquire(blocking=False):
+            self.send_overloaded()
+            return
+        try:
+            data = self.read_body(remain)
+        finally:
+            if self.upload_slots is not None:
+                self.upload_slots.release()
+        if data is None:
+            return
 
         parts = data.split(b"--" + boundary)
         uploaded = False
@@ -672,6 +1631,8 @@ class UPSERVERHandler(SimpleHTTPRequestHandler):
                     actions = f'<a href="/preview/{quote(name)}" class="preview-link">PREVIEW</a>'
                 else:
                     actions = ""
+                if self.is_tailable(name, mime_type):
+                    actions += f'<a href="/tail/{quote(os.path.relpath(fullname, os.getcwd()))}" class="preview-link">TAIL</a>'
                 
             response += f"""
                 <tr>
@@ -704,22 +1665,140 @@ class UPSERVERHandler(SimpleHTTPRequestHandler):
         self.wfile.write(encoded)
         return None
 
+# -------------------------------
+# Threaded Server
+# -------------------------------
+REAP_INTERVAL = 0.5
+RATE_GRACE_PERIOD = 5.0
+UPLOAD_CHUNK_SIZE = 64 * 1024
+OVERLOADED_MESSAGE = "Server busy, retry later"
+
+class UPSERVERServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    # Followers hold their connection open, so each request gets a thread.
+    # Connections over the global or per-IP cap are refused with a 503 from
+    # the accept loop, and a reaper thread shuts down sockets whose header
+    # deadline has passed.
+    daemon_threads = True
+    max_connections = 0
+    max_connections_per_ip = 0
+    retry_after = 5
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.admission_lock = threading.Lock()
+        self.connections = 0
+        self.connections_per_ip = {}
+        self.deadlines = {}
+        threading.Thread(target=self.reap_expired, daemon=True).start()
+
+    def admit(self, ip):
+        with self.admission_lock:
+            if self.max_connections and self.connections >= self.max_connections:
+                return False
+            if self.max_connections_per_ip and self.connections_per_ip.get(ip, 0) >= self.max_connections_per_ip:
+                return False
+            self.connections += 1
+            self.connections_per_ip[ip] = self.connections_per_ip.get(ip, 0) + 1
+            return True
+
+    def release(self, ip):
+        with self.admission_lock:
+            self.connections -= 1
+            remaining = self.connections_per_ip.pop(ip) - 1
+            if remaining:
+                self.connections_per_ip[ip] = remaining
+
+    def reject(self, request):
+        # TLS connections have not done their handshake yet and are just closed
+        if not isinstance(request, ssl.SSLSocket):
+            body = OVERLOADED_MESSAGE.encode("utf-8")
+            response = (
+                f"HTTP/1.0 503 Service Unavailable\r\n"
+                f"Retry-After: {self.retry_after}\r\n"
+                f"Content-Type: text/plain\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n"
+            ).encode("ascii") + body
+            try:
+                request.setblocking(False)
+                request.send(response)
+            except OSError:
+                pass
+        self.shutdown_request(request)
+
+    def process_request(self, request, client_address):
+        if not self.admit(client_address[0]):
+            self.reject(request)
+            return
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self.release(client_address[0])
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.clear_deadline(request)
+            self.release(client_address[0])
+
+    def set_deadline(self, request, timeout):
+        with self.admission_lock:
+            self.deadlines[request] = time.monotonic() + timeout
+
+    def clear_deadline(self, request):
+        with self.admission_lock:
+            self.deadlines.pop(request, None)
+
+    def reap_expired(self):
+        while True:
+            time.sleep(REAP_INTERVAL)
+            now = time.monotonic()
+            with self.admission_lock:
+                expired = [request for request, deadline in self.deadlines.items() if deadline <= now]
+                for request in expired:
+                    del self.deadlines[request]
+            for request in expired:
+                try:
+                    socket.socket.shutdown(request, socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
 # -------------------------------
 # Main Entry
 # -------------------------------
 if __name__ == '__main__':
     args = parse_args()
+    profiler.output_dir = os.path.abspath(args.profile_dir)
     os.chdir(args.dir)
     UPSERVERHandler.upload_password = args.upload_password or ""
+    UPSERVERHandler.header_timeout = args.header_timeout or None
+    UPSERVERHandler.body_timeout = args.body_timeout or None
+    UPSERVERHandler.min_upload_rate = args.min_upload_rate
+    if args.max_uploads:
+        UPSERVERHandler.upload_slots = threading.BoundedSemaphore(args.max_uploads)
+    UPSERVERServer.max_connections = args.max_connections
+    UPSERVERServer.max_connections_per_ip = args.max_connections_per_ip
+    UPSERVERServer.retry_after = args.retry_after
+
+    if args.profile:
+        profiler.enabled = True
+        profiler.token = args.profile_token or ""
+        profiler.sample_rate = min(max(0.0, args.profile_sample), 1.0)
+        profiler.slow_threshold = args.profile_slow_ms / 1000
+        profiler.start()
+        print(f"Profiling enabled, reports in {profiler.output_dir} (control at /debug/profile, local clients or --profile-token only)")
 
-    with socketserver.TCPServer((args.bind, args.port), UPSERVERHandler) as httpd:
+    with UPSERVERServer((args.bind, args.port), UPSERVERHandler) as httpd:
         if args.ssl:
             if not args.cert or not args.key:
                 args.cert, args.key = generate_self_signed_cert()
 
             context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
             context.load_cert_chain(certfile=args.cert, keyfile=args.key)
-            httpd.socket = context.wrap_socket(httpd.socket, server_side=True)
+            # Handshake runs in the request thread so a stalled client cannot block accept()
+            httpd.socket = context.wrap_socket(httpd.socket, server_side=True, do_handshake_on_connect=False)
             print(f"UPSERVER serving on {args.bind} port {args.port} (https://{args.bind}:{args.port})")
         else:
             print(f"UPSERVER serving on {args.bind} port {args.port} (http://{args.bind}:{args.port})")
@@ -728,3 +1807,6 @@ if __name__ == '__main__':
             httpd.serve_forever()
         except KeyboardInterrupt:
             print("\nKeyboard interrupt received, exiting")
+            if profiler.active:
+                profiler.stop()
+                profiler.write_reports()